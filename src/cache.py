@@ -0,0 +1,168 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from crewai import LLM
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.expanduser(os.getenv('CREWAI_CACHE_DIR', '~/.crewai_cache'))
+
+# How often a cache deletes its expired rows, in seconds
+PURGE_INTERVAL = float(os.getenv('CACHE_PURGE_INTERVAL', 60 * 60))
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultCache:
+    """
+    Key/value store with per-entry expiry, persisted in a SQLite file so that
+    cached results survive worker restarts and are shared between processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        self.purge_expired()
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a JSON-serializable value for ttl seconds"""
+        with self.get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl)
+            )
+        if time.time() - self.purged_at > PURGE_INTERVAL:
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Delete expired rows so the file does not grow with every stored value"""
+        self.purged_at = time.time()
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (self.purged_at,))
+
+class CachingLLM(LLM):
+    """
+    LLM that answers repeated prompts from a persistent cache. The key covers the
+    model, temperature and the full message history, so a hit only happens when
+    the agent has seen exactly the same context (including tool observations).
+    """
+
+    def __init__(self, *args, cache_ttl: float = 24 * 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_ttl = cache_ttl
+        # Like lookups and stores, the cache is best-effort: without it every call goes to the API
+        try:
+            self.cache = ResultCache(os.path.join(CACHE_DIR, 'llm.sqlite3'))
+        except Exception as e:
+            logger.warning(f"LLM cache unavailable, calls will not be cached: {str(e)}")
+            self.cache = None
+
+    def call(self, messages, *args, **kwargs):
+        # Native function calling has side effects we cannot replay
+        if self.cache is None or kwargs.get('tools') or kwargs.get('available_functions'):
+            return super().call(messages, *args, **kwargs)
+
+        key = make_key(self.model, self.temperature, messages)
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            cached = None
+        if cached is not None:
+            logger.info("LLM cache hit")
+            return cached
+
+        response = super().call(messages, *args, **kwargs)
+        if isinstance(response, str) and response:
+            try:
+                self.cache.set(key, response, self.cache_ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache store failed: {str(e)}")
+        return response
+
+@functools.lru_cache(maxsize=1)
+def _get_tool_cache() -> Optional[ResultCache]:
+    """Shared tool result store, or None if it cannot be opened; expired reports are purged by ResultCache"""
+    try:
+        return ResultCache(os.path.join(CACHE_DIR, 'tools.sqlite3'))
+    except Exception as e:
+        logger.warning(f"Tool cache unavailable, results will not be cached: {str(e)}")
+        return None
+
+class Uncached(str):
+    """Tool result that is returned as usual but never stored, e.g. a partial report"""
+
+def _is_error_result(result: Any) -> bool:
+    if isinstance(result, dict):
+        return 'error' in result
+    return not result or str(result).startswith(('Error', 'No subpages found'))
+
+def tool_cache(ttl: float) -> Callable:
+    """Decorator caching a tool's _run result per tool name and arguments for ttl seconds"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache = _get_tool_cache()
+            if cache is None:
+                return func(self, *args, **kwargs)
+
+            key = make_key(self.name, args, kwargs)
+            try:
+                cached = cache.get(key)
+            except Exception as e:
+                logger.warning(f"Tool cache lookup failed for {self.name}: {str(e)}")
+                cached = None
+            if cached is not None:
+                logger.info(f"Tool cache hit: {self.name}")
+                return cached
+
+            logger.info(f"Tool cache miss: {self.name}")
+            result = func(self, *args, **kwargs)
+            if isinstance(result, Uncached):
+                return str(result)
+            if not _is_error_result(result):
+                try:
+                    cache.set(key, result, ttl)
+                except Exception as e:
+                    logger.warning(f"Tool cache store failed for {self.name}: {str(e)}")
+            return result
+        return wrapper
+    return decorator
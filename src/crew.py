@@ -1,23 +1,138 @@
 # src/crew.py
 from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task
+from crewai.tools import BaseTool
 from dotenv import load_dotenv
-import openai
+import functools
 import os
+import re
 import yaml
-from .tools.LoadingTimeTracker import LoadingTimeTracker
-from .tools.MobileTesting import MobileOptimizationTool
-from .tools.SubpageAnalyzer import SubpageAnalyzer
-from .tools.BrowserlessScraper import BrowserlessScraper
+from .tools.ParallelSiteProbe import ParallelSiteProbe
+from .cache import CachingLLM
 import asyncio
+from dataclasses import asdict, dataclass, field
 from typing import Dict, Any, List
 import logging
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-@CrewBase
+@functools.lru_cache(maxsize=None)
+def _load_config(path: str) -> Dict[str, Any]:
+    """Load a YAML config file once per process; callers must not mutate the result"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+@functools.lru_cache(maxsize=1)
+def get_llm() -> LLM:
+    """Process-wide LLM shared by every agent, created on first use"""
+    return CachingLLM(
+        model='gpt-4o',
+        api_key=os.getenv('OPENAI_API_KEY'),
+        max_retries=3,
+        timeout=float(os.getenv('OPENAI_TIMEOUT', 60)),
+        temperature=0.5,
+        cache_ttl=float(os.getenv('LLM_CACHE_TTL', 24 * 3600))
+    )
+
+@dataclass(slots=True)
+class SEOResults:
+    """Structured analysis results; one field per results table column"""
+    meta_tags: Dict[str, Any] = field(default_factory=dict)
+    headings: Dict[str, Any] = field(default_factory=dict)
+    keywords: Dict[str, Any] = field(default_factory=dict)
+    links: Dict[str, Any] = field(default_factory=dict)
+    images: Dict[str, Any] = field(default_factory=dict)
+    content_stats: Dict[str, Any] = field(default_factory=dict)
+    mobile_stats: Dict[str, Any] = field(default_factory=dict)
+    performance_stats: Dict[str, Any] = field(default_factory=dict)
+    recommendations: Dict[str, Any] = field(default_factory=dict)
+
+# Section marker found in a task output -> (result field, extractor method)
+_SECTION_EXTRACTORS = {
+    "Meta Tags Analysis": ("meta_tags", "_extract_meta_info"),
+    "Content Analysis": ("keywords", "_extract_keyword_info"),
+    "Content Structure": ("headings", "_extract_heading_info"),
+    "Link Analysis": ("links", "_extract_link_info"),
+    "Media Inventory": ("images", "_extract_image_info"),
+    "Performance Metrics": ("performance_stats", "_extract_performance_info"),
+    "Mobile Optimization": ("mobile_stats", "_extract_mobile_info"),
+    "OPTIMIZATION RECOMMENDATIONS": ("recommendations", "_extract_recommendations")
+}
+_SECTION_RE = re.compile("|".join(map(re.escape, _SECTION_EXTRACTORS)))
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+
+def _label_pattern(labels: Dict[str, str], value: str = r'(\d+)') -> re.Pattern:
+    """Compile one pattern matching any "<label>: <value>" pair for the given labels"""
+    return re.compile(r'(%s):[ \t]*%s' % ('|'.join(map(re.escape, labels)), value))
+
+# "* name: 3 ..." lines and the "Total number of meta tags: N" summary.
+# The name match is lazy but may span colons, so namespaced tags like og:title are kept
+_META_LINE_RE = re.compile(r'^[ \t]*\*[ \t]*([^\n]+?):[ \t]*(\d+)', re.M)
+_META_TOTAL_RE = re.compile(r'Total number of meta tags:\s*(\d+)')
+
+_TOTAL_WORDS_RE = re.compile(r'(?:Total Words|Total word count):\s*(\d+)')
+_KEYWORD_LINE_RE = re.compile(r'^[ \t]*\*[ \t]*([^:\n]+?):[ \t]*(\d+)[^\n(]*(?:\(' + _NUMBER + r'%)?', re.M)
+
+_HEADING_LABELS = {"H1 tags": "h1", "H2 tags": "h2", "H3 tags": "h3", "H4-H6 tags": "h4_h6"}
+_HEADING_RE = _label_pattern(_HEADING_LABELS)
+
+_LINK_LABELS = {"Internal links": "internal", "External links": "external", "Broken links found": "broken"}
+_LINK_RE = _label_pattern(_LINK_LABELS)
+
+_IMAGE_LABELS = {
+    "Total images": "total_images",
+    "Images with alt text": "with_alt",
+    "Images without alt text": "without_alt"
+}
+_IMAGE_RE = _label_pattern(_IMAGE_LABELS)
+
+_PERFORMANCE_LABELS = {
+    "Average load time": "avg_load_time",
+    "Fastest load": "fastest_load",
+    "Slowest load": "slowest_load"
+}
+_PERFORMANCE_RE = _label_pattern(_PERFORMANCE_LABELS, _NUMBER)
+
+_VIEWPORT_RE = re.compile(r'Viewport Meta Tag:([^:\n]*)')
+_MOBILE_LABELS = {"Text Readability Score": "text_readability", "Tap Target Spacing Score": "tap_target_spacing"}
+_MOBILE_RE = _label_pattern(_MOBILE_LABELS, _NUMBER)
+
+def _add_priority_fix(recommendations: Dict, line: str):
+    issue, arrow, target = line.partition("->")
+    if arrow:
+        recommendations["priority_fixes"].append({"issue": issue.strip(), "target": target.strip()})
+
+def _add_statistic(section: str, recommendations: Dict, line: str):
+    key, colon, value = line.partition(":")
+    if colon:
+        recommendations[section][key.strip()] = value.strip()
+
+def _add_page_optimization(recommendations: Dict, line: str):
+    if line.startswith("- ["):
+        recommendations["page_specific"].append(line.strip("- "))
+
+# Recommendation section header -> result key, and the line parser for each section
+_RECOMMENDATION_SECTIONS = {
+    "Priority Fixes": "priority_fixes",
+    "Impact Forecast": "impact_forecast",
+    "Key Statistics": "key_statistics",
+    "Page-Specific Optimizations": "page_specific"
+}
+_RECOMMENDATION_HEADER_RE = re.compile(r'(%s):' % '|'.join(map(re.escape, _RECOMMENDATION_SECTIONS)))
+_RECOMMENDATION_HANDLERS = {
+    "priority_fixes": _add_priority_fix,
+    "impact_forecast": functools.partial(_add_statistic, "impact_forecast"),
+    "key_statistics": functools.partial(_add_statistic, "key_statistics"),
+    "page_specific": _add_page_optimization
+}
+
 class SEOAnalyseCrew():
     """
     Main class that orchestrates the SEO analysis process using multiple AI agents.
@@ -26,54 +141,50 @@ class SEOAnalyseCrew():
     agents_config = os.path.join(os.path.dirname(__file__), 'config', 'agents.yaml')
     tasks_config = os.path.join(os.path.dirname(__file__), 'config', 'tasks.yaml')
 
+    # Agents and tools hold no per-site state (the URL lives on the tasks), so every
+    # job in the process reuses one set. The worker runs one crew at a time. Tasks are
+    # per instance and are released with it once the job is done.
+    _shared_tools: List[BaseTool] = []
+    _shared_agents: Dict[str, Agent] = {}
+
     def __init__(self, website_url: str):
         """Initialize with target website URL and load config files"""
         self.website_url = website_url
         logger.info(f"Initializing SEO Analysis Crew for {website_url}")
         
-        with open(self.agents_config, 'r') as f:
-            self.agents_config = yaml.safe_load(f)
-        with open(self.tasks_config, 'r') as f:
-            self.tasks_config = yaml.safe_load(f)
+        self.agents_config = _load_config(self.agents_config)
+        self.tasks_config = _load_config(self.tasks_config)
             
-        self.tools = [
-            BrowserlessScraper(),
-            LoadingTimeTracker(),
-            MobileOptimizationTool(),
-            SubpageAnalyzer()
-        ]
-        logger.info("Tools initialized successfully")
+        if not self._shared_tools:
+            self._shared_tools.append(ParallelSiteProbe())
+            logger.info("Tools initialized successfully")
+        self.tools = self._shared_tools
+        self.site_probe = self.tools[0]
         
-        self.agents = {
-            'scraper_agent': self.scraper_agent(),
-            'analyse_agent': self.analyse_agent(),
-            'optimization_agent': self.optimization_agent()
-        }
-        logger.info("Agents initialized successfully")
+        if not self._shared_agents:
+            self._shared_agents.update({
+                'scraper_agent': self.scraper_agent(),
+                'analyse_agent': self.analyse_agent(),
+                'optimization_agent': self.optimization_agent()
+            })
+            logger.info("Agents initialized successfully")
+        self.agents = self._shared_agents
         
         self.tool_timeout = 60
-        super().__init__()
-
-    openai_llm = LLM(
-        model='gpt-4o',
-        api_key=os.getenv('OPENAI_API_KEY'),
-        max_retries=3,
-        temperature=0.5
-    )
+        self.site_data = ""
 
-    @agent
     def scraper_agent(self) -> Agent:
         """Agent responsible for collecting data from the website"""        
+        # No tools: run() collects the data up front, and letting the agent re-run the probe
+        # only repeated errors such as the mobile tester's on every job
         return Agent(
             role=self.agents_config['scraper_agent']['role'],
             goal=self.agents_config['scraper_agent']['goal'],
             backstory=self.agents_config['scraper_agent']['backstory'],
-            tools=self.tools,
             verbose=True,
-            llm=self.openai_llm
+            llm=get_llm()
         )
 
-    @agent
     def analyse_agent(self) -> Agent:
         """Agent responsible for analyzing collected data"""
         return Agent(
@@ -81,10 +192,9 @@ class SEOAnalyseCrew():
             goal=self.agents_config['analyse_agent']['goal'],
             backstory=self.agents_config['analyse_agent']['backstory'],
             verbose=True,
-            llm=self.openai_llm
+            llm=get_llm()
         )
     
-    @agent
     def optimization_agent(self) -> Agent:
         """Agent responsible for providing optimization recommendations"""
         return Agent(
@@ -92,198 +202,161 @@ class SEOAnalyseCrew():
             goal=self.agents_config['optimization_agent']['goal'],
             backstory=self.agents_config['optimization_agent']['backstory'],
             verbose=True,
-            llm=self.openai_llm
+            llm=get_llm()
         )
 
-    @task
+    # Built once per crew; earlier tasks are shared as context by the later ones
+    @functools.cached_property
     def data_collection_task(self) -> Task:
         """Task for collecting website data"""
         task_config = self.tasks_config['data_collection_task']
+        description = task_config['description'].format(website_url=self.website_url)
+        description += (
+            "\n\nThe data collection tools were already run against this website. Base the "
+            "report on their output below and mark any section that reports an error as unavailable.\n\n"
+            + self.site_data
+        )
         return Task(
-            description=task_config['description'].format(website_url=self.website_url),
+            name='data_collection_task',
+            description=description,
             expected_output=task_config['expected_output'].format(website_url=self.website_url),
             agent=self.agents['scraper_agent'],
             context_variables={"website_url": self.website_url},
             max_retries=3
         )
 
-    @task
+    @functools.cached_property
     def analysis_task(self) -> Task:
         """Task for analyzing collected data"""
         task_config = self.tasks_config['analysis_task']
         return Task(
+            name='analysis_task',
             description=task_config['description'].format(website_url=self.website_url),
             agent=self.agents['analyse_agent'],
-            expected_output=task_config['expected_output']
+            expected_output=task_config['expected_output'],
+            context=[self.data_collection_task]
         )
 
-    @task
+    @functools.cached_property
     def optimization_task(self) -> Task:
         """Task for generating optimization recommendations"""
         task_config = self.tasks_config['optimization_task']
         return Task(
+            name='optimization_task',
             description=task_config['description'],
             agent=self.agents['optimization_agent'],
-            expected_output=task_config['expected_output']
+            expected_output=task_config['expected_output'],
+            context=[self.data_collection_task, self.analysis_task]
         )
 
     async def run(self) -> Dict[str, Any]:
         """Run the SEO analysis crew and return results as JSON"""
         try:
-            crew = Crew(
-                agents=[self.scraper_agent(), self.analyse_agent(), self.optimization_agent()],
-                tasks=[
-                    self.data_collection_task(),
-                    self.analysis_task(),
-                    self.optimization_task()
-                ],
+            # The scraper agent only has to summarise, not drive four tools one after another
+            self.site_data = await self.site_probe._arun(self.website_url)
+
+            collection_crew = Crew(
+                agents=[self.agents['scraper_agent']],
+                tasks=[self.data_collection_task],
                 process=Process.sequential,
                 verbose=True
             )
-            
-            crew_output = crew.kickoff()
-            return self._process_results(crew_output)
+            collection_output = await collection_crew.kickoff_async()
+
+            # The optimization plan is built on the statistical analysis, so they stay in order
+            report_crew = Crew(
+                agents=[self.agents['analyse_agent'], self.agents['optimization_agent']],
+                tasks=[self.analysis_task, self.optimization_task],
+                process=Process.sequential,
+                verbose=True
+            )
+            report_output = await report_crew.kickoff_async()
+
+            return self._process_results([
+                *collection_output.tasks_output,
+                *report_output.tasks_output
+            ])
             
         except Exception as e:
             logger.error(f"Crew run error: {str(e)}")
             return {"error": str(e)}
 
-    def _process_results(self, results) -> Dict[str, Any]:
+    def _process_results(self, tasks_output: List[Any]) -> Dict[str, Any]:
         """Process crew output into structured JSON format"""
-        structured_results = {
-            "meta_tags": {},
-            "headings": {},
-            "keywords": {},
-            "links": {},
-            "images": {},
-            "content_stats": {},
-            "mobile_stats": {},
-            "performance_stats": {},
-            "recommendations": {}
-        }
+        results = SEOResults()
 
         try:
-            if hasattr(results, 'tasks_output'):
-                for task_output in results.tasks_output:
-                    output = str(task_output)
-                    if "Meta Tags Analysis" in output:
-                        structured_results["meta_tags"] = self._extract_meta_info(output)
-                    elif "Content Analysis" in output:
-                        structured_results["keywords"] = self._extract_keyword_info(output)
-                    elif "Content Structure" in output:
-                        structured_results["headings"] = self._extract_heading_info(output)
-                    elif "Link Analysis" in output:
-                        structured_results["links"] = self._extract_link_info(output)
-                    elif "Media Inventory" in output:
-                        structured_results["images"] = self._extract_image_info(output)
-                    elif "Performance Metrics" in output:
-                        structured_results["performance_stats"] = self._extract_performance_info(output)
-                    elif "Mobile Optimization" in output:
-                        structured_results["mobile_stats"] = self._extract_mobile_info(output)
-                    elif "OPTIMIZATION RECOMMENDATIONS" in output:
-                        structured_results["recommendations"] = self._extract_recommendations(output)
-            return structured_results
+            extracted = set()
+            for task_output in tasks_output:
+                output = str(task_output)
+                matches = list(_SECTION_RE.finditer(output))
+                for match, following in zip(matches, matches[1:] + [None]):
+                    section, extractor = _SECTION_EXTRACTORS[match.group()]
+                    # The scraper report comes first and is the authoritative source for each section
+                    if section not in extracted:
+                        # Each extractor only sees its own section, up to the next marker
+                        body = output[match.end():following.start() if following else len(output)]
+                        setattr(results, section, getattr(self, extractor)(body))
+                        extracted.add(section)
+                # The report template lists the total word count under Content Structure
+                if "keywords" in extracted and not results.keywords.get("total_words"):
+                    total = _TOTAL_WORDS_RE.search(output)
+                    if total:
+                        results.keywords["total_words"] = int(total.group(1))
+            return asdict(results)
         except Exception as e:
             logger.error(f"Error processing results: {str(e)}")
             return {"error": str(e)}
 
     def _extract_meta_info(self, text: str) -> Dict:
         meta_info = {"total_tags": 0, "tags": {}}
-        lines = text.split('\n')
-        for line in lines:
-            if "Total number of meta tags:" in line:
-                meta_info["total_tags"] = int(line.split(':')[1].strip())
-            elif "*" in line and ":" in line:
-                tag, count = line.split(':')
-                meta_info["tags"][tag.strip("* ")] = int(count.split()[0])
+        total = _META_TOTAL_RE.search(text)
+        if total:
+            meta_info["total_tags"] = int(total.group(1))
+        meta_info["tags"] = {tag.strip(): int(count) for tag, count in _META_LINE_RE.findall(text)}
         return meta_info
 
-def _extract_keyword_info(self, text: str) -> Dict:
-    keyword_info = {"frequent_words": {}, "density": {}, "total_words": 0}
-    lines = text.split('\n')
-    for line in lines:
-        line = line.strip()
-        if "Total Words:" in line or "Total word count:" in line:
-            keyword_info["total_words"] = int(line.split(':', 1)[1].strip())
-        elif "*" in line and ":" in line:
-            parts = line.split(':', 1)
-            word = parts[0].strip("* ").strip()
-            count_part = parts[1].strip()
-            try:
-                # Extract count (e.g., "3" from "3 occurrences (8.33%)")
-                count_str = count_part.split()[0]
-                count = int(count_str)
-                keyword_info["frequent_words"][word] = count
-                # Extract density if present (e.g., "8.33" from "(8.33%)")
-                if '(' in count_part and '%' in count_part:
-                    density_str = count_part.split('(')[1].split('%')[0]
-                    density = float(density_str)
-                    keyword_info["density"][word] = density
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Skipping malformed keyword line: {line} - {str(e)}")
-                continue
-    return keyword_info
+    def _extract_keyword_info(self, text: str) -> Dict:
+        keyword_info = {"frequent_words": {}, "density": {}, "total_words": 0}
+        for total in _TOTAL_WORDS_RE.findall(text):
+            keyword_info["total_words"] = int(total)
+        # e.g. "* seo: 3 occurrences (8.33%)"
+        for word, count, density in _KEYWORD_LINE_RE.findall(text):
+            keyword_info["frequent_words"][word.strip()] = int(count)
+            if density:
+                keyword_info["density"][word.strip()] = float(density)
+        return keyword_info
 
     def _extract_heading_info(self, text: str) -> Dict:
         heading_info = {"h1": 0, "h2": 0, "h3": 0, "h4_h6": 0}
-        lines = text.split('\n')
-        for line in lines:
-            if "H1 tags:" in line:
-                heading_info["h1"] = int(line.split(':')[1].strip())
-            elif "H2 tags:" in line:
-                heading_info["h2"] = int(line.split(':')[1].strip())
-            elif "H3 tags:" in line:
-                heading_info["h3"] = int(line.split(':')[1].strip())
-            elif "H4-H6 tags:" in line:
-                heading_info["h4_h6"] = int(line.split(':')[1].strip())
+        for label, value in _HEADING_RE.findall(text):
+            heading_info[_HEADING_LABELS[label]] = int(value)
         return heading_info
 
     def _extract_link_info(self, text: str) -> Dict:
         link_info = {"internal": 0, "external": 0, "broken": 0}
-        lines = text.split('\n')
-        for line in lines:
-            if "Internal links:" in line:
-                link_info["internal"] = int(line.split(':')[1].strip())
-            elif "External links:" in line:
-                link_info["external"] = int(line.split(':')[1].strip())
-            elif "Broken links found:" in line:
-                link_info["broken"] = int(line.split(':')[1].strip())
+        for label, value in _LINK_RE.findall(text):
+            link_info[_LINK_LABELS[label]] = int(value)
         return link_info
 
     def _extract_image_info(self, text: str) -> Dict:
         image_info = {"total_images": 0, "with_alt": 0, "without_alt": 0}
-        lines = text.split('\n')
-        for line in lines:
-            if "Total images:" in line:
-                image_info["total_images"] = int(line.split(':')[1].strip())
-            elif "Images with alt text:" in line:
-                image_info["with_alt"] = int(line.split(':')[1].strip())
-            elif "Images without alt text:" in line:
-                image_info["without_alt"] = int(line.split(':')[1].strip())
+        for label, value in _IMAGE_RE.findall(text):
+            image_info[_IMAGE_LABELS[label]] = int(value)
         return image_info
 
     def _extract_performance_info(self, text: str) -> Dict:
         performance_info = {"avg_load_time": 0.0, "fastest_load": 0.0, "slowest_load": 0.0}
-        lines = text.split('\n')
-        for line in lines:
-            if "Average load time:" in line:
-                performance_info["avg_load_time"] = float(line.split(':')[1].strip().split()[0])
-            elif "Fastest load:" in line:
-                performance_info["fastest_load"] = float(line.split(':')[1].strip().split()[0])
-            elif "Slowest load:" in line:
-                performance_info["slowest_load"] = float(line.split(':')[1].strip().split()[0])
+        for label, value in _PERFORMANCE_RE.findall(text):
+            performance_info[_PERFORMANCE_LABELS[label]] = float(value)
         return performance_info
 
     def _extract_mobile_info(self, text: str) -> Dict:
         mobile_info = {"viewport": "No", "text_readability": 0, "tap_target_spacing": 0}
-        lines = text.split('\n')
-        for line in lines:
-            if "Viewport Meta Tag:" in line:
-                mobile_info["viewport"] = line.split(':')[1].strip()
-            elif "Text Readability Score:" in line:
-                mobile_info["text_readability"] = float(line.split(':')[1].strip().rstrip('%'))
-            elif "Tap Target Spacing Score:" in line:
-                mobile_info["tap_target_spacing"] = float(line.split(':')[1].strip().rstrip('%'))
+        for viewport in _VIEWPORT_RE.findall(text):
+            mobile_info["viewport"] = viewport.strip()
+        for label, value in _MOBILE_RE.findall(text):
+            mobile_info[_MOBILE_LABELS[label]] = float(value)
         return mobile_info
 
     def _extract_recommendations(self, text: str) -> Dict:
@@ -293,31 +366,12 @@ def _extract_keyword_info(self, text: str) -> Dict:
             "key_statistics": {},
             "page_specific": []
         }
-        lines = text.split('\n')
         current_section = None
-        for line in lines:
+        for line in text.split('\n'):
             line = line.strip()
-            if "Priority Fixes:" in line:
-                current_section = "priority_fixes"
-            elif "Impact Forecast:" in line:
-                current_section = "impact_forecast"
-            elif "Key Statistics:" in line:
-                current_section = "key_statistics"
-            elif "Page-Specific Optimizations:" in line:
-                current_section = "page_specific"
+            header = _RECOMMENDATION_HEADER_RE.search(line)
+            if header:
+                current_section = _RECOMMENDATION_SECTIONS[header.group(1)]
             elif line and current_section:
-                if current_section == "priority_fixes" and "->" in line:
-                    issue, target = line.split("->")
-                    recommendations["priority_fixes"].append({
-                        "issue": issue.strip(),
-                        "target": target.strip()
-                    })
-                elif current_section == "impact_forecast" and ":" in line:
-                    key, value = line.split(":")
-                    recommendations["impact_forecast"][key.strip()] = value.strip()
-                elif current_section == "key_statistics" and ":" in line:
-                    key, value = line.split(":")
-                    recommendations["key_statistics"][key.strip()] = value.strip()
-                elif current_section == "page_specific" and line.startswith("- ["):
-                    recommendations["page_specific"].append(line.strip("- "))
+                _RECOMMENDATION_HANDLERS[current_section](recommendations, line)
         return recommendations
\ No newline at end of file
@@ -1,14 +1,34 @@
 # src/db/database.py
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import orjson
+from psycopg2.extras import Json, RealDictCursor
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from contextlib import contextmanager
-import json
 import logging
+import threading
+from typing import Optional, Tuple
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# JSONB columns of the results table, one per analysis section
+RESULT_COLUMNS = (
+    'meta_tags', 'headings', 'keywords', 'links', 'images',
+    'content_stats', 'mobile_stats', 'performance_stats', 'recommendations'
+)
+
+# Serializes the result columns into one JSON object so the API can pass it through unparsed
+_RESULTS_JSON_QUERY = "SELECT json_build_object({})::text AS result FROM results WHERE job_id = %s".format(
+    ", ".join(f"'{column}', COALESCE({column}, '{{}}'::jsonb)" for column in RESULT_COLUMNS)
+)
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+def _json(value) -> Json:
+    """Adapt a value for a JSONB column, serializing with orjson"""
+    return Json(value, dumps=_orjson_dumps)
+
 class Database:
     def __init__(self):
         database_url = os.getenv('DATABASE_URL')
@@ -31,13 +51,41 @@ class Database:
                 'port': os.getenv('POSTGRES_PORT', '5432')
             }
 
+        self.max_connections = int(os.getenv('DB_MAX_CONNECTIONS', '10'))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when every connection is
+        # checked out, so callers queue here for a free one
+        self._checkouts = threading.BoundedSemaphore(self.max_connections)
+        self.checkout_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+    def get_pool(self) -> ThreadedConnectionPool:
+        """Create the connection pool on first use so importing the service does not need the database"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(1, self.max_connections, **self.conn_params)
+        return self._pool
+
     @contextmanager
     def get_connection(self):
-        conn = psycopg2.connect(**self.conn_params)
+        if not self._checkouts.acquire(timeout=self.checkout_timeout):
+            raise PoolError("timed out waiting for a database connection")
         try:
-            yield conn
+            pool = self.get_pool()
+            conn = pool.getconn()
+            try:
+                yield conn
+            finally:
+                # Drop connections the server closed so they are not handed out again
+                pool.putconn(conn, close=bool(conn.closed))
         finally:
-            conn.close()
+            self._checkouts.release()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
 
     @contextmanager
     def get_cursor(self):
@@ -52,16 +100,53 @@ class Database:
             finally:
                 cursor.close()
 
+    def ping(self):
+        """Raise if the database cannot be reached"""
+        with self.get_cursor() as cur:
+            cur.execute("SELECT 1")
+
+    @staticmethod
+    def _insert_job(cur, website_url) -> int:
+        cur.execute(
+            "INSERT INTO jobs (website_url) VALUES (%s) RETURNING id",
+            (website_url,)
+        )
+        return cur.fetchone()['id']
+
     def create_job(self, website_url):
         with self.get_cursor() as cur:
+            return self._insert_job(cur, website_url)
+
+    def get_or_create_job(self, website_url) -> Tuple[int, bool]:
+        """
+        Return (job_id, created): a recent job for this URL that is still queued or
+        running, or a new pending one. The advisory lock serializes callers for the
+        same URL across every API process until the transaction ends.
+        """
+        with self.get_cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (website_url,))
+            # A pending job only counts while its message can still be in flight, so
+            # a lost publish does not swallow every request for the URL for an hour
             cur.execute(
-                "INSERT INTO jobs (website_url) VALUES (%s) RETURNING id",
+                """
+                SELECT id FROM jobs
+                WHERE website_url = %s
+                  AND (
+                    (status IN ('started', 'running') AND created_at > CURRENT_TIMESTAMP - INTERVAL '1 hour')
+                    OR (status = 'pending' AND created_at > CURRENT_TIMESTAMP - INTERVAL '10 minutes')
+                  )
+                ORDER BY id DESC
+                LIMIT 1
+                """,
                 (website_url,)
             )
-            return cur.fetchone()['id']
+            row = cur.fetchone()
+            if row:
+                return row['id'], False
+            return self._insert_job(cur, website_url), True
 
     def update_job_status(self, job_id, status, error=None):
-        """Update job status with timestamp"""
+        """Update job status with timestamp and return the updated job row"""
         with self.get_cursor() as cur:
             if status == 'started' or status == 'running':
                 cur.execute(
@@ -69,6 +154,7 @@ class Database:
                     UPDATE jobs 
                     SET status = %s, started_at = CURRENT_TIMESTAMP 
                     WHERE id = %s
+                    RETURNING *
                     """,
                     (status, job_id)
                 )
@@ -78,6 +164,7 @@ class Database:
                     UPDATE jobs 
                     SET status = %s, completed_at = CURRENT_TIMESTAMP 
                     WHERE id = %s
+                    RETURNING *
                     """,
                     (status, job_id)
                 )
@@ -87,39 +174,45 @@ class Database:
                     UPDATE jobs 
                     SET status = %s, error = %s 
                     WHERE id = %s
+                    RETURNING *
                     """,
                     (status, error, job_id)
                 )
             else:
                 cur.execute(
-                    "UPDATE jobs SET status = %s WHERE id = %s",
+                    "UPDATE jobs SET status = %s WHERE id = %s RETURNING *",
                     (status, job_id)
                 )
+            return cur.fetchone()
 
     def store_results(self, job_id: int, results: dict):
         """Store analysis results in the database"""
         try:
             with self.get_cursor() as cur:
+                # Insert the results and complete the job in one statement and transaction
                 cur.execute("""
-                    INSERT INTO results (
-                        job_id, meta_tags, headings, keywords, links, images,
-                        content_stats, mobile_stats, performance_stats, recommendations
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    WITH inserted AS (
+                        INSERT INTO results (
+                            job_id, meta_tags, headings, keywords, links, images,
+                            content_stats, mobile_stats, performance_stats, recommendations
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    )
+                    UPDATE jobs
+                    SET status = 'completed', completed_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
                 """, (
                     job_id,
-                    json.dumps(results.get('meta_tags', {})),
-                    json.dumps(results.get('headings', {})),
-                    json.dumps(results.get('keywords', {})),
-                    json.dumps(results.get('links', {})),
-                    json.dumps(results.get('images', {})),
-                    json.dumps(results.get('content_stats', {})),
-                    json.dumps(results.get('mobile_stats', {})),
-                    json.dumps(results.get('performance_stats', {})),
-                    json.dumps(results.get('recommendations', {}))
+                    _json(results.get('meta_tags', {})),
+                    _json(results.get('headings', {})),
+                    _json(results.get('keywords', {})),
+                    _json(results.get('links', {})),
+                    _json(results.get('images', {})),
+                    _json(results.get('content_stats', {})),
+                    _json(results.get('mobile_stats', {})),
+                    _json(results.get('performance_stats', {})),
+                    _json(results.get('recommendations', {})),
+                    job_id
                 ))
-                
-                self.update_job_status(job_id, 'completed')
-                
         except Exception as e:
             logger.error(f"Error storing results for job {job_id}: {str(e)}")
             self.update_job_status(job_id, 'error', str(e))
@@ -133,10 +226,9 @@ class Database:
             )
             return cur.fetchone()
 
-    def get_job_results(self, job_id):
+    def get_job_results(self, job_id) -> Optional[str]:
+        """Return the job's results as one JSON object text, built by Postgres"""
         with self.get_cursor() as cur:
-            cur.execute(
-                "SELECT * FROM results WHERE job_id = %s",
-                (job_id,)
-            )
-            return cur.fetchone()
\ No newline at end of file
+            cur.execute(_RESULTS_JSON_QUERY, (job_id,))
+            row = cur.fetchone()
+            return row['result'] if row else None
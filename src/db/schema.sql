@@ -24,4 +24,5 @@ CREATE TABLE results (
 );
 
 CREATE INDEX idx_jobs_status ON jobs(status);
-CREATE INDEX idx_jobs_website_url ON jobs(website_url); 
\ No newline at end of file
+CREATE INDEX idx_jobs_website_url ON jobs(website_url); 
+CREATE INDEX idx_results_job_id ON results(job_id);
\ No newline at end of file
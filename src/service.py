@@ -1,21 +1,26 @@
 # src/service.py
 from fastapi import FastAPI, HTTPException, Response, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import logging
 import pika
-import json
+import orjson
 import threading
+import functools
 import time
 import asyncio
 from datetime import datetime
 from typing import Optional
-from pika.exceptions import AMQPConnectionError
+from queue import SimpleQueue
+from pika.exceptions import AMQPChannelError, AMQPConnectionError
 import ssl
 import os
+from urllib.parse import parse_qs, quote, urlparse
+
+import aio_pika
+from aio_pika.pool import Pool
 
 from .db.database import Database
-from .crew import SEOAnalyseCrew
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,88 +28,200 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 db = Database()
 
+QUEUE_NAME = 'seo_analysis'
+# Upper bound for the worker's exponential reconnect backoff, in seconds
+WORKER_MAX_RETRY_DELAY = int(os.getenv('RABBITMQ_MAX_RETRY_DELAY', '30'))
+PUBLISH_BATCH_SIZE = int(os.getenv('RABBITMQ_PUBLISH_BATCH_SIZE', '100'))
+# Jobs run off the connection's thread, so heartbeats are always answered and a short
+# interval is safe; it lets both sides notice a dead connection within minutes
+RABBITMQ_CONNECTION_DEFAULTS = {
+    'heartbeat': 60,
+    'blocked_connection_timeout': 300,
+    'connection_attempts': 3,
+    'retry_delay': 1,
+    'socket_timeout': 10
+}
+AVAILABILITY_CHECK_INTERVAL = float(os.getenv('AVAILABILITY_CHECK_INTERVAL', '5'))
+
 class InputData(BaseModel):
     """Schema for input data"""
     website_url: str
     max_pages: int = 50
 
+def get_rabbitmq_url() -> str:
+    """Build the AMQP URL from the environment"""
+    rabbitmq_url = os.getenv('RABBITMQ_URL')
+    if rabbitmq_url:
+        return rabbitmq_url
+    return "amqp://{}:{}@{}/".format(
+        quote(os.getenv('RABBITMQ_USER', 'user'), safe=''),
+        quote(os.getenv('RABBITMQ_PASS', 'password'), safe=''),
+        os.getenv('RABBITMQ_HOST', 'rabbitmq')
+    )
+
+async def get_channel_pool() -> Optional[Pool]:
+    """Return the shared publisher channel pool, connecting on first use"""
+    if app.state.channel_pool is not None:
+        return app.state.channel_pool
+
+    async with app.state.publisher_lock:
+        if app.state.channel_pool is None:
+            try:
+                connection = await aio_pika.connect_robust(get_rabbitmq_url())
+
+                async def get_channel() -> aio_pika.abc.AbstractChannel:
+                    # Jobs are tracked in Postgres, so skip the per-publish broker confirm
+                    return await connection.channel(publisher_confirms=False)
+
+                channel_pool = Pool(
+                    get_channel,
+                    max_size=int(os.getenv('RABBITMQ_MAX_CHANNEL_POOL_SIZE', '64'))
+                )
+                async with channel_pool.acquire() as channel:
+                    await channel.declare_queue(QUEUE_NAME, durable=True)
+
+                app.state.amqp_connection = connection
+                app.state.channel_pool = channel_pool
+                logger.info("RabbitMQ publisher connected")
+            except Exception as e:
+                logger.error(f"RabbitMQ publisher connection error: {str(e)}")
+                return None
+
+    return app.state.channel_pool
+
+async def publisher_worker():
+    """Drain the publish queue and publish queued jobs in batches over one channel"""
+    queue = app.state.publish_queue
+    # Connect up front so the first job does not wait for the AMQP handshake
+    await get_channel_pool()
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < PUBLISH_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        try:
+            channel_pool = await get_channel_pool()
+            if not channel_pool:
+                raise ConnectionError("Queue service unavailable")
+
+            async with channel_pool.acquire() as channel:
+                outcomes = await asyncio.gather(*[
+                    channel.default_exchange.publish(
+                        aio_pika.Message(
+                            body=orjson.dumps(job),
+                            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                        ),
+                        routing_key=QUEUE_NAME
+                    )
+                    for job in batch
+                ], return_exceptions=True)
+        except Exception as e:
+            outcomes = [e] * len(batch)
+
+        for job, outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error publishing job {job['job_id']}: {str(outcome)}")
+                try:
+                    await asyncio.to_thread(db.update_job_status, job['job_id'], 'error', str(outcome))
+                except Exception as e:
+                    logger.error(f"Error updating job {job['job_id']}: {str(e)}")
+            queue.task_done()
+
+def get_rabbitmq_parameters() -> pika.URLParameters:
+    """Consumer connection parameters; options set in RABBITMQ_URL's query string take precedence"""
+    url = get_rabbitmq_url()
+    parameters = pika.URLParameters(url)
+    query = parse_qs(urlparse(url).query)
+    for name, value in RABBITMQ_CONNECTION_DEFAULTS.items():
+        if name not in query:
+            setattr(parameters, name, value)
+    return parameters
+
 def get_rabbitmq_connection() -> Optional[pika.BlockingConnection]:
     """Create RabbitMQ connection with retry logic"""
     try:
-        rabbitmq_url = os.getenv('RABBITMQ_URL')
-        
-        if rabbitmq_url:
-            parameters = pika.URLParameters(rabbitmq_url)
-        else:
-            credentials = pika.PlainCredentials(
-                os.getenv('RABBITMQ_USER', 'user'),
-                os.getenv('RABBITMQ_PASS', 'password')
-            )
-            parameters = pika.ConnectionParameters(
-                host=os.getenv('RABBITMQ_HOST', 'rabbitmq'),
-                credentials=credentials,
-                heartbeat=600,
-                blocked_connection_timeout=300
-            )
-            
-        return pika.BlockingConnection(parameters)
+        return pika.BlockingConnection(get_rabbitmq_parameters())
     except Exception as e:
         logger.error(f"RabbitMQ connection error: {str(e)}")
         return None
 
-def process_message(ch, method, properties, body):
+_worker_state = threading.local()
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Event loop reused for every message handled on the current analysis thread"""
+    loop = getattr(_worker_state, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _worker_state.loop = loop
+    return loop
+
+def ack_message(connection: pika.BlockingConnection, channel, delivery_tag: int):
+    """Ack from the analysis thread; pika channels may only be used on the connection's thread"""
     try:
-        data = json.loads(body)
+        connection.add_callback_threadsafe(functools.partial(channel.basic_ack, delivery_tag=delivery_tag))
+    except Exception as e:
+        # The connection dropped mid-job; the broker will redeliver the message
+        logger.error(f"Could not ack message {delivery_tag}: {str(e)}")
+
+def process_message(connection: pika.BlockingConnection, channel, delivery_tag: int, body: bytes):
+    """Run one analysis job on the analysis thread and ack it when done"""
+    # crewAI and litellm take seconds to import; only the worker needs them
+    from .crew import SEOAnalyseCrew
+
+    try:
+        data = orjson.loads(body)
         job_id = data['job_id']
         website_url = data['website_url']
         
         db.update_job_status(job_id, 'started')  # Changed from 'running'
         
         crew = SEOAnalyseCrew(website_url)
-        results = asyncio.run(crew.run())
+        results = get_worker_loop().run_until_complete(crew.run())
         
         if results and "error" not in results:
-            db.store_results(job_id, results)  # This calls update_job_status('completed')
+            db.store_results(job_id, results)  # Also marks the job completed
         else:
             error_msg = results.get('error', 'No results returned') if results else 'Analysis failed'
             db.update_job_status(job_id, 'error', error_msg)
-        
-        ch.basic_ack(delivery_tag=method.delivery_tag)
     except Exception as e:
         logger.error(f"Error processing message: {str(e)}")
         if 'job_id' in locals():
             db.update_job_status(job_id, 'error', str(e))
-        if 'method' in locals():
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+    finally:
+        ack_message(connection, channel, delivery_tag)
+
+def enqueue_message(jobs: SimpleQueue, connection: pika.BlockingConnection, channel, method, properties, body: bytes):
+    """Consumer callback: hand the message to the analysis thread and return to the I/O loop"""
+    jobs.put((connection, channel, method.delivery_tag, body))
+
+def run_analysis_jobs(jobs: SimpleQueue):
+    """Analysis thread: runs queued messages one at a time, off the connection's thread"""
+    while True:
+        try:
+            process_message(*jobs.get())
+        except Exception as e:
+            logger.error(f"Analysis thread error: {str(e)}")
 
 @app.post("/start_job")
 async def start_job(input_data: InputData):
     """Start a new analysis job"""
     try:
-        job_id = db.create_job(input_data.website_url)
-        
-        connection = get_rabbitmq_connection()
-        if not connection:
+        channel_pool = await get_channel_pool()
+        if not channel_pool:
             raise HTTPException(status_code=503, detail="Queue service unavailable")
-            
-        channel = connection.channel()
-        channel.queue_declare(queue='seo_analysis', durable=True)
-        
-        channel.basic_publish(
-            exchange='',
-            routing_key='seo_analysis',
-            body=json.dumps({
+
+        # Coalesce concurrent requests for the same site onto the job already in flight
+        job_id, created = await asyncio.to_thread(db.get_or_create_job, input_data.website_url)
+        if created:
+            await app.state.publish_queue.put({
                 'job_id': job_id,
                 'website_url': input_data.website_url,
                 'max_pages': input_data.max_pages
-            }),
-            properties=pika.BasicProperties(
-                delivery_mode=2
-            )
-        )
+            })
         
         return {
             "status": "success",
@@ -112,13 +229,15 @@ async def start_job(input_data: InputData):
             "payment_id": f"pay_{job_id}"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error starting job: {str(e)}")
         raise HTTPException(status_code=500, detail="Error starting analysis job")
 
 @app.get("/status")
-async def get_status(job_id: int):
-    """Get job status and results"""
+def get_status(job_id: int):
+    """Get job status and results; sync so FastAPI runs the DB queries in its threadpool"""
     try:
         job = db.get_job_status(job_id)
         if not job:
@@ -138,44 +257,47 @@ async def get_status(job_id: int):
         if job['status'] == 'completed':
             results = db.get_job_results(job_id)
             if results:
-                response["result"] = {
-                    "meta_tags": json.loads(results['meta_tags']) if results['meta_tags'] else {},
-                    "headings": json.loads(results['headings']) if results['headings'] else {},
-                    "keywords": json.loads(results['keywords']) if results['keywords'] else {},
-                    "links": json.loads(results['links']) if results['links'] else {},
-                    "images": json.loads(results['images']) if results['images'] else {},
-                    "content_stats": json.loads(results['content_stats']) if results['content_stats'] else {},
-                    "mobile_stats": json.loads(results['mobile_stats']) if results['mobile_stats'] else {},
-                    "performance_stats": json.loads(results['performance_stats']) if results['performance_stats'] else {},
-                    "recommendations": json.loads(results['recommendations']) if results['recommendations'] else {}
-                }
+                # Already serialized by Postgres; embedded in the response without re-parsing
+                response["result"] = orjson.Fragment(results)
 
-        return response
+        # Returned as a response object so FastAPI's jsonable_encoder, which
+        # cannot handle orjson.Fragment, is skipped
+        return ORJSONResponse(response)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error checking status: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.get("/availability")
-async def check_availability():
-    """Check service availability"""
-    try:
-        db.get_cursor()
-        connection = get_rabbitmq_connection()
-        if not connection:
-            return {
+async def availability_monitor():
+    """Refresh the cached availability so /availability never touches the backends itself"""
+    while True:
+        try:
+            await asyncio.to_thread(db.ping)
+            channel_pool = await get_channel_pool()
+            if not channel_pool or app.state.amqp_connection.is_closed:
+                availability = {
+                    "status": "unavailable",
+                    "message": "Queue service is not responding"
+                }
+            else:
+                availability = {
+                    "status": "available",
+                    "message": "Service is operational"
+                }
+        except Exception as e:
+            availability = {
                 "status": "unavailable",
-                "message": "Queue service is not responding"
+                "message": str(e)
             }
-        return {
-            "status": "available",
-            "message": "Service is operational"
-        }
-    except Exception as e:
-        return {
-            "status": "unavailable",
-            "message": str(e)
-        }
+        app.state.availability = availability
+        await asyncio.sleep(AVAILABILITY_CHECK_INTERVAL)
+
+@app.get("/availability")
+async def check_availability():
+    """Check service availability, as of the last background check"""
+    return app.state.availability
 
 @app.get("/input_schema")
 async def get_input_schema():
@@ -211,50 +333,96 @@ async def get_input_schema():
 @app.head("/health")
 async def health_check():
     """Health check endpoint"""
-    return JSONResponse(
+    return ORJSONResponse(
         content={"status": "healthy"},
         headers={"Cache-Control": "no-cache"}
     )
 
 def start_worker():
     """Worker process to consume RabbitMQ messages"""
+    # Jobs run on their own thread so the connection keeps answering heartbeats
+    # during multi-minute analyses instead of being dropped by the broker
+    jobs = SimpleQueue()
+    threading.Thread(target=run_analysis_jobs, args=(jobs,), daemon=True).start()
+    delay = 1
     while True:
+        connection = get_rabbitmq_connection()
+        if not connection:
+            logger.error(f"RabbitMQ connection failed, retrying in {delay}s...")
+            time.sleep(delay)
+            delay = min(delay * 2, WORKER_MAX_RETRY_DELAY)
+            continue
+        delay = 1
+
         try:
-            connection = get_rabbitmq_connection()
-            if not connection:
-                logger.error("RabbitMQ connection failed, retrying in 5s...")
-                time.sleep(5)
-                continue
-                
+            # Declare and qos are per channel, so they only run again after a reconnect
             channel = connection.channel()
-            channel.queue_declare(queue='seo_analysis', durable=True)
+            channel.queue_declare(queue=QUEUE_NAME, durable=True)
             channel.basic_qos(prefetch_count=1)
             
             logger.info("Worker started, waiting for messages...")
             channel.basic_consume(
-                queue='seo_analysis',
-                on_message_callback=process_message
+                queue=QUEUE_NAME,
+                on_message_callback=functools.partial(enqueue_message, jobs, connection)
             )
             
             channel.start_consuming()
-            
+        except AMQPConnectionError as e:
+            logger.error(f"Worker connection lost: {str(e)}, reconnecting in {delay}s...")
+        except AMQPChannelError as e:
+            logger.error(f"Worker channel closed: {str(e)}, reconnecting in {delay}s...")
         except Exception as e:
-            logger.error(f"Worker error: {str(e)}")
-            time.sleep(5)
+            logger.error(f"Worker error: {str(e)}, reconnecting in {delay}s...")
+        finally:
+            # A closed channel leaves the connection open; drop it before reconnecting
+            if connection.is_open:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+        time.sleep(delay)
+        delay = min(delay * 2, WORKER_MAX_RETRY_DELAY)
 
 @app.on_event("startup")
 async def startup_event():
-    """Start worker thread on startup"""
+    """Connect the publisher and, unless disabled, start the worker thread on startup"""
+    app.state.amqp_connection = None
+    app.state.channel_pool = None
+    app.state.publisher_lock = asyncio.Lock()
+    app.state.publish_queue = asyncio.Queue()
+
     if os.getenv('DYNO'):
         ssl_context = ssl.create_default_context()
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
         
-    worker_thread = threading.Thread(target=start_worker, daemon=True)
-    worker_thread.start()
-    logger.info("Worker thread started")
+    # The consumer and the publisher connect in the background, side by side,
+    # so startup does not wait on the broker. Deployments that run src.worker
+    # as separate processes turn the in-process consumer off.
+    if os.getenv('EMBEDDED_WORKER', 'true').lower() == 'true':
+        worker_thread = threading.Thread(target=start_worker, daemon=True)
+        worker_thread.start()
+        logger.info("Worker thread started")
+    app.state.publisher_task = asyncio.create_task(publisher_worker())
+    app.state.availability = {
+        "status": "unavailable",
+        "message": "Service is starting"
+    }
+    app.state.availability_task = asyncio.create_task(availability_monitor())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    logging.info("Shutting down worker...")
\ No newline at end of file
+    logging.info("Shutting down worker...")
+    try:
+        await asyncio.wait_for(app.state.publish_queue.join(), timeout=5)
+    except asyncio.TimeoutError:
+        logger.error(f"Dropping {app.state.publish_queue.qsize()} unpublished jobs")
+    app.state.availability_task.cancel()
+    app.state.publisher_task.cancel()
+    if app.state.channel_pool is not None:
+        await app.state.channel_pool.close()
+    if app.state.amqp_connection is not None:
+        await app.state.amqp_connection.close()
+    db.close()
\ No newline at end of file
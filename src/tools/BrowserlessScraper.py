@@ -9,6 +9,9 @@ import os
 import re
 from urllib.parse import urlparse
 
+from ..cache import tool_cache
+from .http_session import get_session
+
 class BrowserlessScraperInput(BaseModel):
     """Input for BrowserlessScraper"""
     website_url: str = Field(..., description="The URL of the website to scrape")
@@ -26,6 +29,7 @@ class BrowserlessScraper(BaseTool):
     """
     args_schema: Type[BaseModel] = BrowserlessScraperInput
 
+    @tool_cache(ttl=60 * 60)
     def _run(self, website_url: str, wait_time: int = 5) -> str:
         """Runs the scraper with the given parameters"""
         try:
@@ -45,7 +49,7 @@ class BrowserlessScraper(BaseTool):
                 }
             }
 
-            response = requests.post(
+            response = get_session().post(
                 scrape_url,
                 json=payload,
                 headers={'Content-Type': 'application/json'},
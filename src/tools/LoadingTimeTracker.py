@@ -18,6 +18,9 @@ import statistics
 from datetime import datetime
 from urllib.parse import urlparse
 
+from ..cache import tool_cache
+from .http_session import get_timing_session
+
 # Define input schema requiring a URL to test
 class LoadingTimeInput(BaseModel):
     """Input for LoadingTimeTracker"""
@@ -37,6 +40,7 @@ class LoadingTimeTracker(BaseTool):
     """
     args_schema: Type[BaseModel] = LoadingTimeInput
 
+    @tool_cache(ttl=60 * 60)
     def _run(self, website_url: str, samples: int = 3) -> str:
         """Runs the loading time analysis"""
         try:
@@ -72,7 +76,7 @@ class LoadingTimeTracker(BaseTool):
                         }
                     }
 
-                    response = requests.post(
+                    response = get_timing_session().post(
                         scrape_url,
                         json=payload,
                         headers={'Content-Type': 'application/json'},
@@ -1,20 +1,16 @@
 # Import required libraries:
 # - crewai.tools.BaseTool: Base class for creating custom tools
-# - selenium: For browser automation and testing
+# - selenium: For browser automation and testing (imported on first use, it is heavy)
 # - pydantic: For data validation and settings management
 # - typing: For type hints
 from crewai.tools import BaseTool
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from typing import Dict, Optional, Type
 from pydantic import BaseModel, Field
-from selenium.common.exceptions import TimeoutException
 import logging
 import os
 
+from ..cache import tool_cache
+
 logger = logging.getLogger(__name__)
 
 # Define input schema for the mobile testing tool
@@ -36,9 +32,13 @@ class MobileOptimizationTool(BaseTool):
     description: str = "Tests website for mobile optimization and responsiveness"
     args_schema: Type[BaseModel] = MobileTestingInput
 
+    @tool_cache(ttl=24 * 60 * 60)
     def _run(self, url: str) -> Dict:
         """Run the mobile optimization test"""
         try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+
             chrome_options = Options()
             chrome_options.add_argument('--headless')
             chrome_options.add_argument('--no-sandbox')
@@ -46,16 +46,18 @@ class MobileOptimizationTool(BaseTool):
             chrome_options.add_argument('--mobile')
             
             driver = webdriver.Chrome(options=chrome_options)
-            driver.set_window_size(375, 812)  # iPhone X dimensions
-            
-            results = {
-                "viewport": self._check_viewport(driver),
-                "touch_elements": self._check_touch_elements(driver),
-                "images": self._check_responsive_images(driver),
-                "fonts": self._check_font_sizes(driver)
-            }
-            
-            driver.quit()
+            try:
+                driver.set_window_size(375, 812)  # iPhone X dimensions
+                
+                results = {
+                    "viewport": self._check_viewport(driver),
+                    "touch_elements": self._check_touch_elements(driver),
+                    "images": self._check_responsive_images(driver),
+                    "fonts": self._check_font_sizes(driver)
+                }
+            finally:
+                # Quit on the error path too, or every failed run leaves a headless Chrome behind
+                driver.quit()
             return results
             
         except Exception as e:
@@ -63,6 +65,7 @@ class MobileOptimizationTool(BaseTool):
 
     def _check_text_readability(self, driver) -> Dict:
         try:
+            from selenium.webdriver.common.by import By
             text_elements = driver.find_elements(By.XPATH, "//*[not(self::script)]/text()")
             return {
                 "readable_text_elements": len(text_elements),
@@ -73,6 +76,7 @@ class MobileOptimizationTool(BaseTool):
 
     def _check_tap_targets(self, driver) -> Dict:
         try:
+            from selenium.webdriver.common.by import By
             clickable_elements = driver.find_elements(By.XPATH, "//*[self::button or self::a or self::input]")
             return {
                 "clickable_elements": len(clickable_elements),
@@ -83,6 +87,7 @@ class MobileOptimizationTool(BaseTool):
 
     def _check_responsive_images(self, driver) -> Dict:
         try:
+            from selenium.webdriver.common.by import By
             images = driver.find_elements(By.TAG_NAME, "img")
             responsive_images = [img for img in images if img.get_attribute("srcset") or img.get_attribute("sizes")]
             return {
@@ -95,6 +100,7 @@ class MobileOptimizationTool(BaseTool):
 
     def _check_font_sizes(self, driver) -> Dict:
         try:
+            from selenium.webdriver.common.by import By
             text_elements = driver.find_elements(By.XPATH, "//*[not(self::script)]/text()")
             return {
                 "text_elements": len(text_elements),
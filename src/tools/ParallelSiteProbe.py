@@ -0,0 +1,73 @@
+from crewai.tools import BaseTool
+from typing import Any, Dict, Iterator, List, Tuple, Type
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+
+from .BrowserlessScraper import BrowserlessScraper
+from .LoadingTimeTracker import LoadingTimeTracker
+from .MobileTesting import MobileOptimizationTool
+from .SubpageAnalyzer import SubpageAnalyzer
+
+logger = logging.getLogger(__name__)
+
+class ParallelSiteProbeInput(BaseModel):
+    """Input for ParallelSiteProbe"""
+    website_url: str = Field(..., description="The URL of the website to analyze")
+
+def _default_tools() -> List[BaseTool]:
+    return [
+        BrowserlessScraper(),
+        LoadingTimeTracker(),
+        MobileOptimizationTool(),
+        SubpageAnalyzer()
+    ]
+
+class ParallelSiteProbe(BaseTool):
+    name: str = "Parallel Site Probe"
+    description: str = """
+    Runs every website data collection tool at once and returns their combined output:
+    - Browserless Web Scraper: meta tags, headings, keywords, links, images
+    - Loading Time Tracker: load time samples and performance rating
+    - Mobile Optimization Tester: viewport, touch elements, images, fonts
+    - Subpage Analyzer: top subpages ranked by importance
+    """
+    args_schema: Type[BaseModel] = ParallelSiteProbeInput
+    tools: List[BaseTool] = Field(default_factory=_default_tools)
+
+    def _calls(self, website_url: str) -> Iterator[Tuple[BaseTool, Dict[str, str]]]:
+        """Yields each tool with its arguments; the mobile tester names its URL field 'url'"""
+        for tool in self.tools:
+            url_field = 'url' if 'url' in tool.args_schema.model_fields else 'website_url'
+            yield tool, {url_field: website_url}
+
+    def _run(self, website_url: str) -> str:
+        """Runs all tools concurrently; they are I/O bound, so wall time is the slowest tool"""
+        with ThreadPoolExecutor(max_workers=len(self.tools)) as executor:
+            futures = [executor.submit(tool.run, **kwargs) for tool, kwargs in self._calls(website_url)]
+            outputs = []
+            for future in futures:
+                try:
+                    outputs.append(future.result())
+                except Exception as e:
+                    outputs.append(e)
+        return self._format_results(outputs)
+
+    async def _arun(self, website_url: str) -> str:
+        """Async version for callers already on an event loop"""
+        outputs = await asyncio.gather(
+            *[asyncio.to_thread(tool.run, **kwargs) for tool, kwargs in self._calls(website_url)],
+            return_exceptions=True
+        )
+        return self._format_results(outputs)
+
+    def _format_results(self, outputs: List[Any]) -> str:
+        """Combines the tool outputs into one report, one section per tool"""
+        report = []
+        for tool, output in zip(self.tools, outputs):
+            if isinstance(output, Exception):
+                logger.error(f"{tool.name} failed: {str(output)}")
+                output = f"Error running {tool.name}: {str(output)}"
+            report.append(f"=== {tool.name} ===\n{output}")
+        return "\n\n".join(report)
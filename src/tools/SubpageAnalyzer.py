@@ -1,15 +1,21 @@
 from crewai.tools import BaseTool
-from typing import Type, Optional, Dict, List
+from typing import Type, Optional, Dict, List, Tuple
 from pydantic import BaseModel, Field
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import xml.etree.ElementTree as ET
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import re
 import time
 import os
 
+from ..cache import Uncached, tool_cache
+from .http_session import MAX_CONNECTIONS, get_session
+
+# Leave a few shared connections free so the other tools are not starved by the fan-out
+MAX_WORKERS = max(1, MAX_CONNECTIONS - 2)
+
 class SubpageAnalyzerInput(BaseModel):
     """Input parameters for subpage analysis"""
     website_url: str = Field(..., description="The URL of the website to analyze")
@@ -27,6 +33,7 @@ class SubpageAnalyzer(BaseTool):
     """
     args_schema: Type[BaseModel] = SubpageAnalyzerInput
 
+    @tool_cache(ttl=7 * 24 * 60 * 60)
     def _run(self, website_url: str, max_pages: int = 50, min_content_length: int = 500) -> str:
         try:
             # Get base domain
@@ -37,10 +44,14 @@ class SubpageAnalyzer(BaseTool):
             subpages = self._find_subpages(base_url, max_pages)
             
             # Analyze each subpage
-            analyzed_pages = self._analyze_subpages(subpages, min_content_length)
+            analyzed_pages, failed = self._analyze_subpages(subpages, min_content_length)
             
             # Rank and format results
-            return self._format_results(analyzed_pages)
+            report = self._format_results(analyzed_pages)
+            if failed:
+                # Pages lost to rate limits or timeouts must not be missing from a report cached for a week
+                return Uncached(f"{report}\n- Pages That Could Not Be Fetched: {failed}")
+            return report
             
         except Exception as e:
             return f"Error analyzing subpages: {str(e)}"
@@ -59,7 +70,7 @@ class SubpageAnalyzer(BaseTool):
             
             for sitemap_url in sitemap_urls:
                 try:
-                    response = requests.get(sitemap_url, timeout=10)
+                    response = get_session().get(sitemap_url, timeout=10)
                     if response.status_code == 200:
                         root = ET.fromstring(response.content)
                         for url in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc'):
@@ -105,7 +116,7 @@ class SubpageAnalyzer(BaseTool):
                     }
                 }
                 
-                response = requests.post(
+                response = get_session().post(
                     scrape_url,
                     json=payload,
                     headers={'Content-Type': 'application/json'},
@@ -154,59 +165,78 @@ class SubpageAnalyzer(BaseTool):
         except ZeroDivisionError:
             return 0.0
 
-    def _analyze_subpages(self, urls: List[str], min_content_length: int) -> List[Dict]:
-        """Analyzes each subpage using browserless"""
-        analyzed_pages = []
+    def _analyze_subpages(self, urls: List[str], min_content_length: int) -> Tuple[List[Dict], int]:
+        """
+        Analyzes the subpages concurrently using browserless, keeping the input order.
+        Returns the analyzed pages and the number of pages that could not be fetched.
+        """
+        if not urls:
+            return [], 0
         browserless_api_key = os.getenv('BROWSERLESS_API_KEY')
         scrape_url = f'https://chrome.browserless.io/content?token={browserless_api_key}'
         
-        for url in urls:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls))) as executor:
+            futures = [
+                executor.submit(self._analyze_subpage, url, scrape_url, min_content_length)
+                for url in urls
+            ]
+        
+        analyzed_pages = []
+        failed = 0
+        for future in futures:
             try:
-                payload = {
-                    'url': url,
-                    'gotoOptions': {
-                        'waitUntil': 'networkidle0',
-                        'timeout': 30000
-                    }
-                }
-                
-                response = requests.post(
-                    scrape_url,
-                    json=payload,
-                    headers={
-                        'Content-Type': 'application/json',
-                        'Cache-Control': 'no-cache'
-                    },
-                    timeout=45
-                )
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    content = self._extract_main_content(soup)
-                    
-                    if len(content) < min_content_length:
-                        continue
-                    
-                    page_metrics = {
-                        'url': url,
-                        'title': soup.title.string if soup.title else 'No title',
-                        'content_length': len(content),
-                        'headings': len(soup.find_all(['h1', 'h2', 'h3'])),
-                        'images': len(soup.find_all('img')),
-                        'internal_links': len([l for l in soup.find_all('a', href=True) 
-                                            if not l['href'].startswith(('http', 'https'))]),
-                        'external_links': len([l for l in soup.find_all('a', href=True) 
-                                            if l['href'].startswith(('http', 'https'))]),
-                        'importance_score': 0
-                    }
-                    
-                    page_metrics['importance_score'] = self._calculate_importance(page_metrics)
-                    analyzed_pages.append(page_metrics)
-                
-            except Exception as e:
+                page = future.result()
+            except Exception:
+                failed += 1
                 continue
+            if page is not None:
+                analyzed_pages.append(page)
+        return analyzed_pages, failed
+
+    def _analyze_subpage(self, url: str, scrape_url: str, min_content_length: int) -> Optional[Dict]:
+        """Fetches and scores a single subpage; returns None if it is too thin and raises if it fails"""
+        payload = {
+            'url': url,
+            'gotoOptions': {
+                'waitUntil': 'networkidle0',
+                'timeout': 30000
+            }
+        }
+        
+        response = get_session().post(
+            scrape_url,
+            json=payload,
+            headers={
+                'Content-Type': 'application/json',
+                'Cache-Control': 'no-cache'
+            },
+            timeout=45
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"browserless returned {response.status_code} for {url}")
+        
+        soup = BeautifulSoup(response.text, 'html.parser')
+        content = self._extract_main_content(soup)
+        
+        if len(content) < min_content_length:
+            return None
+        
+        page_metrics = {
+            'url': url,
+            'title': soup.title.string if soup.title else 'No title',
+            'content_length': len(content),
+            'headings': len(soup.find_all(['h1', 'h2', 'h3'])),
+            'images': len(soup.find_all('img')),
+            'internal_links': len([l for l in soup.find_all('a', href=True) 
+                                if not l['href'].startswith(('http', 'https'))]),
+            'external_links': len([l for l in soup.find_all('a', href=True) 
+                                if l['href'].startswith(('http', 'https'))]),
+            'importance_score': 0
+        }
         
-        return analyzed_pages
+        page_metrics['importance_score'] = self._calculate_importance(page_metrics)
+        return page_metrics
 
     def _extract_main_content(self, soup: BeautifulSoup) -> str:
         """Extracts main content from page, excluding navigation, footer, etc."""
@@ -0,0 +1,32 @@
+import functools
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_CONNECTIONS = int(os.getenv('BROWSERLESS_MAX_CONNECTIONS', '10'))
+
+@functools.lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Process-wide HTTP session shared by the tools. Connections to browserless are
+    kept alive between calls, and pool_block caps how many requests are in flight
+    at once so the concurrent probes stay under browserless' concurrency limit.
+    """
+    adapter = HTTPAdapter(pool_maxsize=MAX_CONNECTIONS, pool_block=True)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+@functools.lru_cache(maxsize=1)
+def get_timing_session() -> requests.Session:
+    """
+    Session for the loading time probes. It has its own non-blocking pool so a
+    measured request never starts its clock while waiting for a shared connection.
+    """
+    adapter = HTTPAdapter(pool_block=False)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
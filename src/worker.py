@@ -0,0 +1,6 @@
+# src/worker.py
+"""Standalone analysis worker: python -m src.worker"""
+from .service import start_worker
+
+if __name__ == "__main__":
+    start_worker()